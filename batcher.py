@@ -0,0 +1,70 @@
+"""Micro-batching of concurrent inference requests."""
+import queue
+import threading
+import time
+
+
+class _Request:
+    __slots__ = ("text", "result", "error", "done")
+
+    def __init__(self, text):
+        self.text = text
+        self.result = None
+        self.error = None
+        self.done = threading.Event()
+
+
+class Batcher:
+    """Coalesce concurrent single-text calls into batched calls.
+
+    A daemon worker thread collects up to ``max_batch`` queued texts, waiting
+    at most ``max_wait_ms`` after the first one arrives, and passes them to
+    ``fn`` as one list. ``fn`` must return one result per text, in order.
+    """
+
+    def __init__(self, fn, max_batch=16, max_wait_ms=20):
+        self.fn = fn
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self._queue = queue.Queue()
+        self._worker = threading.Thread(target=self._run, daemon=True)
+        self._worker.start()
+
+    def submit(self, text):
+        """Queue a text and block until its result is ready."""
+        request = _Request(text)
+        self._queue.put(request)
+        request.done.wait()
+        if request.error is not None:
+            raise request.error
+        return request.result
+
+    def _collect(self):
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=timeout))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            try:
+                results = list(self.fn([request.text for request in batch]))
+                if len(results) != len(batch):
+                    raise RuntimeError(f"Expected {len(batch)} results, got {len(results)}")
+            except BaseException as exc:
+                # Fail the whole batch rather than leave any caller waiting
+                for request in batch:
+                    request.error = exc
+                    request.done.set()
+                continue
+            for request, result in zip(batch, results):
+                request.result = result
+                request.done.set()
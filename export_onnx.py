@@ -0,0 +1,48 @@
+"""Export the translation model to INT8 ONNX Runtime graphs.
+
+Run once before starting the app:
+
+    python export_onnx.py
+
+The model is exported to ``onnx_models/<org>--<name>`` next to this script
+and its encoder and decoder graphs are dynamically quantized to INT8. The app
+loads the export when present and falls back to the PyTorch pipeline
+otherwise. The app imports this module for the paths only, so optimum and
+transformers are imported inside ``export``.
+"""
+import os
+import sys
+
+ONNX_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "onnx_models")
+ONNX_FILES = ["encoder_model", "decoder_model", "decoder_with_past_model"]
+
+TRANSLATION_MODELS = ["facebook/nllb-200-distilled-600M"]
+
+
+def onnx_model_dir(model_id):
+    """Return the local directory holding the ONNX export of a model."""
+    return os.path.join(ONNX_DIR, model_id.replace("/", "--"))
+
+
+def export(model_id):
+    """Export a seq2seq model to ONNX and quantize its graphs to INT8."""
+    from optimum.onnxruntime import ORTModelForSeq2SeqLM, ORTQuantizer
+    from optimum.onnxruntime.configuration import AutoQuantizationConfig
+    from transformers import AutoTokenizer
+
+    save_dir = onnx_model_dir(model_id)
+    model = ORTModelForSeq2SeqLM.from_pretrained(model_id, export=True)
+    model.save_pretrained(save_dir)
+    AutoTokenizer.from_pretrained(model_id, use_fast=True).save_pretrained(save_dir)
+
+    qconfig = AutoQuantizationConfig.avx512_vnni(is_static=False, per_channel=False)
+    for name in ONNX_FILES:
+        quantizer = ORTQuantizer.from_pretrained(save_dir, file_name=f"{name}.onnx")
+        quantizer.quantize(save_dir=save_dir, quantization_config=qconfig)
+        os.remove(os.path.join(save_dir, f"{name}.onnx"))
+
+
+if __name__ == "__main__":
+    for model_id in sys.argv[1:] or TRANSLATION_MODELS:
+        print(f"Exporting {model_id}...")
+        export(model_id)
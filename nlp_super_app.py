@@ -1,6 +1,49 @@
+import logging
+import os
+import threading
+from collections import OrderedDict
+from functools import wraps
+
+# Keep downloaded models on disk across restarts, and let the Rust tokenizers
+# use their thread pool without the fork-safety check. Must be set before
+# transformers/huggingface_hub are imported.
+os.environ.setdefault("HF_HOME", "/tmp/hf_cache")
+os.environ.setdefault("TOKENIZERS_PARALLELISM", "true")
+
+try:
+    # Optional: serve model weights to every worker process from a single
+    # shared-memory copy. Must be patched in before torch/transformers load.
+    import overmind.api
+    overmind.api.monkey_patch_all()
+except ImportError:
+    pass
+
 import streamlit as st
-from transformers import pipeline
-from langdetect import detect
+import torch
+from huggingface_hub import list_repo_files, snapshot_download
+from ftlangdetect import detect
+from transformers import AutoTokenizer, TextIteratorStreamer, pipeline
+
+try:
+    # Optional: fused attention kernels; removed from optimum 2.0
+    from optimum.bettertransformer import BetterTransformer
+except ImportError:
+    BetterTransformer = None
+
+try:
+    # Optional: BF16 AMX/VNNI kernels on recent Intel Xeons
+    import intel_extension_for_pytorch as ipex
+except ImportError:
+    ipex = None
+
+from batcher import Batcher
+from export_onnx import ONNX_FILES, onnx_model_dir
+from rake import extract_keywords
+
+# No task needs gradients. Grad mode is thread-local, so this covers the
+# script thread on every rerun; pipelines and worker threads additionally
+# run under torch.inference_mode.
+torch.set_grad_enabled(False)
 
 # --------------------
 # Page Setup
@@ -11,10 +54,285 @@ st.title("🧠 Natural Language Processing Toolkit")
 # --------------------
 # Cache Pipelines
 # --------------------
+# Run on the first GPU in half precision when one is available
+DEVICE = 0 if torch.cuda.is_available() else -1
+DTYPE = torch.float16 if torch.cuda.is_available() else torch.float32
+
+# Encoder-decoder models are less stable under dynamic quantization, so the
+# generation tasks keep their FP32 weights.
+GENERATION_TASKS = {"translation", "summarization", "text2text-generation"}
+
+# Reuse past key/values while decoding instead of re-encoding the prefix.
+# Greedy decoding, since token streaming does not support beam search.
+GENERATE_KWARGS = {"use_cache": True, "num_beams": 1}
+
+# Models used for the tasks that previously relied on the pipeline defaults
+DEFAULT_MODELS = {
+    "sentiment-analysis": "distilbert/distilbert-base-uncased-finetuned-sst-2-english",
+    "text-classification": "distilbert/distilbert-base-uncased-finetuned-sst-2-english",
+    "ner": "dbmdz/bert-large-cased-finetuned-conll03-english",
+    "question-answering": "distilbert/distilbert-base-cased-distilled-squad",
+    "summarization": "sshleifer/distilbart-cnn-12-6",
+}
+
+GRAMMAR_MODEL = "prithivida/grammar_error_correcter_v1"
+
+# One multilingual model serves every language pair
+TRANSLATION_MODEL = "facebook/nllb-200-distilled-600M"
+
+# (source, target) NLLB language codes
+LANG_PAIRS = {
+    "English to French": ("eng_Latn", "fra_Latn"),
+    "English to German": ("eng_Latn", "deu_Latn"),
+    "English to Spanish": ("eng_Latn", "spa_Latn"),
+    "English to Hindi": ("eng_Latn", "hin_Deva"),
+    "French to English": ("fra_Latn", "eng_Latn"),
+    "German to English": ("deu_Latn", "eng_Latn"),
+    "Spanish to English": ("spa_Latn", "eng_Latn"),
+    "Hindi to English": ("hin_Deva", "eng_Latn")
+}
+
+# Inputs used to compile and warm up a pipeline when it is first loaded
+WARMUP_INPUTS = {
+    "question-answering": {"question": "What is this?", "context": "This is a warmup."},
+}
+
+
+MODEL_DIR = os.path.join(os.environ["HF_HOME"], "models")
+# Weights for other frameworks that the PyTorch pipelines never load
+SNAPSHOT_IGNORE = ["*.h5", "*.msgpack", "*.ot", "*.onnx", "onnx/*", "tf_model*", "flax_model*", "rust_model*"]
+
+
+@st.cache_resource(show_spinner=False)
+def get_lock(name):
+    """Return a process-wide lock for ``name``, shared across reruns and threads."""
+    return threading.Lock()
+
+
+def local_model(model_id):
+    """Return a local snapshot of a hub model, downloading it only the first time."""
+    local_dir = os.path.join(MODEL_DIR, model_id.replace("/", "--"))
+    marker = os.path.join(local_dir, ".complete")
+    # Tasks sharing a checkpoint, or a click racing the warmup thread, must
+    # not download into the same directory at once
+    with get_lock(local_dir):
+        if not os.path.exists(marker):
+            ignore = SNAPSHOT_IGNORE
+            if any(name.endswith(".safetensors") for name in list_repo_files(model_id)):
+                # pipeline() loads the safetensors weights; skip the duplicate .bin
+                ignore = ignore + ["*.bin"]
+            snapshot_download(model_id, local_dir=local_dir, ignore_patterns=ignore)
+            open(marker, "w").close()
+    return local_dir
+
+
+def bf16_autocast(fn):
+    """Wrap ``fn`` to run under CPU BF16 autocast."""
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        with torch.autocast("cpu", dtype=torch.bfloat16):
+            return fn(*args, **kwargs)
+    return wrapper
+
+
 @st.cache_resource
-def get_pipeline(task, model=None):
+def get_pipeline(task, model=None, **kwargs):
     """Load and cache a transformers pipeline."""
-    return pipeline(task, model=model) if model else pipeline(task)
+    model = local_model(model or DEFAULT_MODELS[task])
+    p = pipeline(task, model=model, device=DEVICE, torch_dtype=DTYPE, use_fast=True, **kwargs)
+    # Run forward passes under inference_mode rather than the default no_grad
+    p.get_inference_context = lambda: torch.inference_mode
+    if task in GENERATION_TASKS:
+        p.model.config.use_cache = True
+    if DEVICE == -1 and task not in GENERATION_TASKS:
+        # Run Linear layers in INT8 on CPU
+        p.model = torch.quantization.quantize_dynamic(p.model, {torch.nn.Linear}, dtype=torch.qint8)
+    else:
+        # Fused attention kernels. BetterTransformer folds the attention
+        # Linear layers into fused weights, so it is only applied to the
+        # models that are not quantized. Some architectures (e.g. Marian)
+        # are unsupported and keep their original layers.
+        if BetterTransformer is not None:
+            try:
+                p.model = BetterTransformer.transform(p.model, keep_original_model=False)
+            except (NotImplementedError, ValueError):
+                pass
+        if ipex is not None and DEVICE == -1:
+            p.model = ipex.optimize(p.model, dtype=torch.bfloat16, inplace=True)
+            p.model.generate = bf16_autocast(p.model.generate)
+    if task not in GENERATION_TASKS:
+        # Compile the forward pass into fused kernels and pay the compile
+        # cost here, inside the cached loader. generate() does not go
+        # through the compiled forward, so seq2seq models stay eager.
+        eager_model = p.model
+        p.model = torch.compile(eager_model, mode="reduce-overhead", fullgraph=False)
+        inputs = WARMUP_INPUTS.get(task, "Warming up the model.")
+        try:
+            p(**inputs) if isinstance(inputs, dict) else p(inputs)
+        except Exception:
+            # Not every model/backend combination compiles; run eagerly
+            p.model = eager_model
+    return p
+
+
+@st.cache_resource
+def get_translator():
+    """Load the INT8 ONNX Runtime export of the translation model on CPU if present."""
+    local_dir = onnx_model_dir(TRANSLATION_MODEL)
+    if DEVICE != -1 or not os.path.isdir(local_dir):
+        return get_pipeline("translation", model=TRANSLATION_MODEL)
+    # Only needed once an export exists; optimum's ONNX Runtime extra is optional
+    from optimum.onnxruntime import ORTModelForSeq2SeqLM
+
+    file_names = {f"{name}_file_name": f"{name}_quantized.onnx" for name in ONNX_FILES}
+    model = ORTModelForSeq2SeqLM.from_pretrained(local_dir, use_cache=True, **file_names)
+    tokenizer = AutoTokenizer.from_pretrained(local_dir, use_fast=True)
+    return pipeline("translation", model=model, tokenizer=tokenizer)
+
+
+def classify_batch(classifier, texts):
+    """Run a text classification pipeline's tokenizer and model directly.
+
+    Skips the per-call dispatch of ``Pipeline.__call__`` and returns the same
+    ``{"label", "score"}`` dicts the pipeline would.
+    """
+    inputs = classifier.tokenizer(texts, return_tensors="pt", padding=True, truncation=True, max_length=256)
+    with torch.inference_mode():
+        probs = classifier.model(**inputs.to(classifier.device)).logits.softmax(-1)
+    scores, ids = probs.max(-1)
+    id2label = classifier.model.config.id2label
+    return [{"label": id2label[i], "score": score} for i, score in zip(ids.tolist(), scores.tolist())]
+
+
+@st.cache_resource
+def get_batcher(task):
+    """Start a micro-batcher shared by all sessions for a text classification task."""
+    classifier = get_pipeline(task)
+    return Batcher(lambda texts: classify_batch(classifier, texts))
+
+
+logger = logging.getLogger(__name__)
+
+
+def _warmup():
+    """Load every model the app uses so first clicks hit a warm cache.
+
+    A failed load is logged and skipped so the remaining models still load;
+    the task retries the load on its first click.
+    """
+    loaders = {
+        "sentiment-analysis": lambda: get_batcher("sentiment-analysis"),
+        "text-classification": lambda: get_batcher("text-classification"),
+        "ner": lambda: get_pipeline("ner", grouped_entities=True),
+        "question-answering": lambda: get_pipeline("question-answering"),
+        "summarization": lambda: get_pipeline("summarization"),
+        "grammar correction": lambda: get_pipeline("text2text-generation", model=GRAMMAR_MODEL),
+        "translation": get_translator,
+        "language detection": lambda: detect("warmup", low_memory=True),
+    }
+    for name, load in loaders.items():
+        try:
+            load()
+        except Exception:
+            logger.exception("Warmup failed to load %s", name)
+
+
+@st.cache_resource
+def start_warmup():
+    """Start loading the models in the background, once per process."""
+    thread = threading.Thread(target=_warmup, daemon=True)
+    thread.start()
+    return thread
+
+
+start_warmup()
+
+# --------------------
+# Cached Inference
+# --------------------
+@st.cache_data(show_spinner=False)
+def run_ner(text):
+    """Extract grouped named entities, cached per input text."""
+    return get_pipeline("ner", grouped_entities=True)(text)
+
+
+@st.cache_data(show_spinner=False)
+def run_sentiment(text):
+    """Classify the sentiment of a text, cached per input text."""
+    return get_batcher("sentiment-analysis").submit(text)
+
+
+@st.cache_data(show_spinner=False)
+def run_classification(text):
+    """Classify a text, cached per input text."""
+    return get_batcher("text-classification").submit(text)
+
+
+@st.cache_data(show_spinner=False)
+def run_language_detection(text):
+    """Detect the language of a text, cached per input text."""
+    # fastText predicts one line at a time and rejects newlines
+    return detect(" ".join(text.split()), low_memory=True)['lang']
+
+
+# Finished generations kept for repeat submissions, across all sessions
+GENERATION_CACHE_SIZE = 256
+
+
+@st.cache_resource
+def get_generation_cache():
+    """Process-wide LRU of finished generations, shared by all sessions."""
+    return OrderedDict()
+
+
+def stream_generate(generator, text, render, src_lang=None, **generate_kwargs):
+    """Generate text token by token, rendering the partial output as it arrives.
+
+    ``render`` is called with the text generated so far, e.g.
+    ``st.empty().info``. ``src_lang`` sets the source language of
+    multilingual tokenizers. Finished outputs are cached per model, text and
+    generation arguments, so repeat submissions render immediately.
+    """
+    cache = get_generation_cache()
+    key = (generator.model.config.name_or_path, src_lang, text, tuple(sorted(generate_kwargs.items())))
+    with get_lock("generation-cache"):
+        output = cache.get(key)
+        if output is not None:
+            cache.move_to_end(key)
+    if output is None:
+        streamer = TextIteratorStreamer(generator.tokenizer, skip_prompt=True, skip_special_tokens=True)
+        # The tokenizer is shared across sessions; src_lang is set and used atomically
+        with get_lock("tokenizer"):
+            if src_lang is not None:
+                generator.tokenizer.src_lang = src_lang
+            inputs = generator.tokenizer(text, return_tensors="pt", truncation=True).to(generator.device)
+        errors = []
+
+        def generate():
+            try:
+                with torch.inference_mode():
+                    generator.model.generate(**inputs, **GENERATE_KWARGS, **generate_kwargs, streamer=streamer)
+            except Exception as exc:
+                errors.append(exc)
+                streamer.end()
+
+        thread = threading.Thread(target=generate, daemon=True)
+        thread.start()
+        output = ""
+        for token in streamer:
+            output += token
+            render(output)
+        thread.join()
+        if errors:
+            raise errors[0]
+        output = output.strip()
+        with get_lock("generation-cache"):
+            cache[key] = output
+            cache.move_to_end(key)
+            while len(cache) > GENERATION_CACHE_SIZE:
+                cache.popitem(last=False)
+    render(output)
+    return output
 
 # --------------------
 # Task Selector
@@ -45,8 +363,7 @@ if task not in ["Question Answering", "Chat with a Document (RAG-based)"]:
 if task == "Sentiment Analysis":
     if st.button("Analyze Sentiment"):
         if text.strip():
-            analyzer = get_pipeline("sentiment-analysis")
-            result = analyzer(text)[0]
+            result = run_sentiment(text)
             st.success(f"**Label**: {result['label']}, **Score**: {round(result['score'], 2)}")
         else:
             st.warning("Please enter text to analyze.")
@@ -54,18 +371,16 @@ if task == "Sentiment Analysis":
 elif task == "Text Summarization":
     if st.button("Summarize"):
         if text.strip():
-            summarizer = get_pipeline("summarization")
-            summary = summarizer(text, max_length=100, min_length=30, do_sample=False)[0]['summary_text']
             st.write("**Summary:**")
-            st.info(summary)
+            stream_generate(get_pipeline("summarization"), text, st.empty().info,
+                            max_length=100, min_length=30, do_sample=False)
         else:
             st.warning("Please enter text to summarize.")
 
 elif task == "Named Entity Recognition (NER)":
     if st.button("Extract Entities"):
         if text.strip():
-            ner = get_pipeline("ner", grouped_entities=True)
-            entities = ner(text)
+            entities = run_ner(text)
             for ent in entities:
                 st.write(f"**{ent['entity_group']}**: {ent['word']} ({round(ent['score'], 2)})")
         else:
@@ -73,23 +388,14 @@ elif task == "Named Entity Recognition (NER)":
 
 elif task == "Translation (Multilingual)":
     st.markdown("### 🌍 Multilingual Translation")
-    lang_pairs = {
-        "English to French": "Helsinki-NLP/opus-mt-en-fr",
-        "English to German": "Helsinki-NLP/opus-mt-en-de",
-        "English to Spanish": "Helsinki-NLP/opus-mt-en-es",
-        "English to Hindi": "Helsinki-NLP/opus-mt-en-hi",
-        "French to English": "Helsinki-NLP/opus-mt-fr-en",
-        "German to English": "Helsinki-NLP/opus-mt-de-en",
-        "Spanish to English": "Helsinki-NLP/opus-mt-es-en",
-        "Hindi to English": "Helsinki-NLP/opus-mt-hi-en"
-    }
-    selected_pair = st.selectbox("Choose language pair", list(lang_pairs.keys()))
+    selected_pair = st.selectbox("Choose language pair", list(LANG_PAIRS.keys()))
     if st.button("Translate"):
         if text.strip():
-            translator = get_pipeline("translation", model=lang_pairs[selected_pair])
-            result = translator(text)[0]['translation_text']
             st.write("**Translated Text:**")
-            st.success(result)
+            src_lang, tgt_lang = LANG_PAIRS[selected_pair]
+            translator = get_translator()
+            stream_generate(translator, text, st.empty().success, src_lang=src_lang,
+                            forced_bos_token_id=translator.tokenizer.convert_tokens_to_ids(tgt_lang))
         else:
             st.warning("Please enter text to translate.")
 
@@ -107,18 +413,15 @@ elif task == "Question Answering":
 elif task == "Grammar Correction":
     if st.button("Correct Grammar"):
         if text.strip():
-            corrector = get_pipeline("text2text-generation", model="prithivida/grammar_error_correcter_v1")
-            result = corrector(text)[0]['generated_text']
             st.write("**Corrected Text:**")
-            st.success(result)
+            stream_generate(get_pipeline("text2text-generation", model=GRAMMAR_MODEL), text, st.empty().success)
         else:
             st.warning("Please enter text for grammar correction.")
 
 elif task == "Text Classification":
     if st.button("Classify Text"):
         if text.strip():
-            classifier = get_pipeline("text-classification")
-            result = classifier(text)[0]
+            result = run_classification(text)
             st.success(f"**Label**: {result['label']} with score {round(result['score'], 2)}")
         else:
             st.warning("Please enter text for classification.")
@@ -126,7 +429,7 @@ elif task == "Text Classification":
 elif task == "Language Detection":
     if st.button("Detect Language"):
         if text.strip():
-            language = detect(text)
+            language = run_language_detection(text)
             st.success(f"**Detected Language**: {language}")
         else:
             st.warning("Please enter text to detect language.")
@@ -134,10 +437,9 @@ elif task == "Language Detection":
 elif task == "Keyword Extraction":
     if st.button("Extract Keywords"):
         if text.strip():
-            ner = get_pipeline("ner", grouped_entities=True)
-            keywords = [ent['word'] for ent in ner(text)]
+            keywords = extract_keywords(text)
             st.write("**Keywords:**")
-            st.info(list(set(keywords)))
+            st.info(keywords)
         else:
             st.warning("Please enter text to extract keywords.")
 
@@ -0,0 +1,212 @@
+"""Numba-compiled RAKE keyword extraction.
+
+Rapid Automatic Keyword Extraction splits a text into candidate phrases at
+stopwords and punctuation, scores every word as ``degree / frequency`` over
+those candidates, and scores a phrase as the sum of its word scores.
+"""
+import unicodedata
+
+import numpy as np
+from numba import njit
+
+STOPWORDS = (
+    "a", "about", "above", "after", "again", "against", "all", "also", "am",
+    "an", "and", "any", "are", "as", "at", "be", "because", "been", "before",
+    "being", "below", "between", "both", "but", "by", "can", "could", "did",
+    "do", "does", "doing", "down", "during", "each", "even", "ever", "few",
+    "for", "from", "further", "had", "has", "have", "having", "he", "her",
+    "here", "hers", "herself", "him", "himself", "his", "how", "however", "i",
+    "if", "in", "into", "is", "it", "it's", "its", "itself", "just", "like",
+    "many", "may", "me", "might", "more", "most", "much", "must", "my",
+    "myself", "no", "nor", "not", "now", "of", "off", "on", "once", "one",
+    "only", "or", "other", "our", "ours", "ourselves", "out", "over", "own",
+    "said", "same", "says", "she", "should", "since", "so", "some", "still",
+    "such", "than", "that", "the", "their", "theirs", "them", "themselves",
+    "then", "there", "these", "they", "this", "those", "through", "to", "too",
+    "under", "until", "up", "upon", "us", "very", "was", "we", "were", "what",
+    "when", "where", "whether", "which", "while", "who", "whom", "whose",
+    "why", "will", "with", "within", "without", "would", "yet", "you", "your",
+    "yours", "yourself", "yourselves",
+)
+
+
+def _build_word_chars():
+    """Flag the Basic Multilingual Plane codepoints that are letters, digits or marks.
+
+    Combining marks are included so words in scripts such as Devanagari are
+    not split at their vowel signs. Codepoints outside the BMP (emoji and
+    other symbols, mostly) never count as word characters.
+    """
+    return np.array(
+        [unicodedata.category(chr(cp))[0] in "LNM" for cp in range(0x10000)],
+        dtype=np.bool_,
+    )
+
+
+WORD_CHARS = _build_word_chars()
+
+
+@njit(cache=True)
+def _is_alnum(cp, word_chars):
+    """Letters, digits and combining marks, per ``WORD_CHARS``."""
+    return cp < word_chars.shape[0] and word_chars[cp]
+
+
+@njit(cache=True)
+def _is_joiner(cp):
+    """Apostrophes and hyphens, which only count as word characters inside a word."""
+    return cp == 39 or cp == 45 or cp == 0x2019
+
+
+@njit(cache=True)
+def _fold_case(cp):
+    """Lowercase ASCII, Latin-1, Greek and Cyrillic capitals."""
+    if 65 <= cp <= 90 or (192 <= cp <= 222 and cp != 215):
+        return cp + 32
+    if 0x391 <= cp <= 0x3A9 or 0x410 <= cp <= 0x42F:
+        return cp + 32
+    if 0x400 <= cp <= 0x40F:
+        return cp + 80
+    return cp
+
+
+@njit(cache=True)
+def _is_space(cp):
+    return cp == 32 or 9 <= cp <= 13 or cp == 160
+
+
+@njit(cache=True)
+def _word_hash(codepoints, start, end):
+    """Case-insensitive FNV-1a hash of ``codepoints[start:end]``, never zero."""
+    h = np.uint64(14695981039346656037)
+    for i in range(start, end):
+        h ^= np.uint64(_fold_case(codepoints[i]))
+        h *= np.uint64(1099511628211)
+    return np.int64(h | np.uint64(1))
+
+
+@njit(cache=True)
+def _lookup(table, h):
+    """Return the slot holding ``h`` in an open-addressing table, or the empty slot for it."""
+    mask = table.shape[0] - 1
+    slot = h & mask
+    while table[slot] != 0 and table[slot] != h:
+        slot = (slot + 1) & mask
+    return slot
+
+
+@njit(cache=True)
+def rake(codepoints, stop_table, word_chars):
+    """Score RAKE candidate phrases in a codepoint array.
+
+    Returns ``(starts, ends, scores)`` giving the character span and score of
+    every candidate phrase, in text order.
+    """
+    n = codepoints.shape[0]
+    stop_mask = stop_table.shape[0] - 1
+
+    # Split into content words, tagging each with the phrase it belongs to
+    word_start = np.empty(n, dtype=np.int64)
+    word_end = np.empty(n, dtype=np.int64)
+    word_hash = np.empty(n, dtype=np.int64)
+    word_phrase = np.empty(n, dtype=np.int64)
+    n_words = 0
+    n_phrases = 0
+    in_phrase = False
+    i = 0
+    while i < n:
+        cp = codepoints[i]
+        if not _is_alnum(cp, word_chars):
+            if not _is_space(cp):
+                in_phrase = False
+            i += 1
+            continue
+        start = i
+        i += 1
+        while i < n:
+            if _is_alnum(codepoints[i], word_chars):
+                i += 1
+            elif _is_joiner(codepoints[i]) and i + 1 < n and _is_alnum(codepoints[i + 1], word_chars):
+                i += 2
+            else:
+                break
+        h = _word_hash(codepoints, start, i)
+        if stop_table[h & stop_mask] == h:
+            in_phrase = False
+            continue
+        if not in_phrase:
+            n_phrases += 1
+            in_phrase = True
+        word_start[n_words] = start
+        word_end[n_words] = i
+        word_hash[n_words] = h
+        word_phrase[n_words] = n_phrases - 1
+        n_words += 1
+
+    phrase_start = np.full(n_phrases, n, dtype=np.int64)
+    phrase_end = np.zeros(n_phrases, dtype=np.int64)
+    phrase_len = np.zeros(n_phrases, dtype=np.int32)
+    for w in range(n_words):
+        p = word_phrase[w]
+        phrase_start[p] = min(phrase_start[p], word_start[w])
+        phrase_end[p] = word_end[w]
+        phrase_len[p] += 1
+
+    # Word frequency and degree (co-occurrences within phrases, self included)
+    size = 1
+    while size < 2 * n_words + 1:
+        size *= 2
+    word_table = np.zeros(size, dtype=np.int64)
+    word_slot = np.empty(n_words, dtype=np.int64)
+    freq = np.zeros(size, dtype=np.int32)
+    degree = np.zeros(size, dtype=np.int32)
+    for w in range(n_words):
+        slot = _lookup(word_table, word_hash[w])
+        word_table[slot] = word_hash[w]
+        word_slot[w] = slot
+        freq[slot] += 1
+        degree[slot] += phrase_len[word_phrase[w]]
+
+    scores = np.zeros(n_phrases, dtype=np.float64)
+    for w in range(n_words):
+        slot = word_slot[w]
+        scores[word_phrase[w]] += degree[slot] / freq[slot]
+    return phrase_start, phrase_end, scores
+
+
+def _codepoints(text):
+    return np.frombuffer(text.encode("utf-32-le"), dtype=np.uint32)
+
+
+def _build_stop_table(words):
+    """Build a collision-free hash table over the stopwords, indexed by ``hash & (size - 1)``."""
+    hashes = [_word_hash(_codepoints(word), 0, len(word)) for word in words]
+    size = 1
+    while size < len(hashes) or len({h & (size - 1) for h in hashes}) < len(hashes):
+        size *= 2
+    table = np.zeros(size, dtype=np.int64)
+    for h in hashes:
+        table[h & (size - 1)] = h
+    return table
+
+
+STOP_TABLE = _build_stop_table(STOPWORDS)
+
+
+def extract_keywords(text, top_k=10):
+    """Return the ``top_k`` highest-scoring keyword phrases of a text.
+
+    Phrases keep the casing of their first occurrence in ``text`` and are
+    deduplicated case-insensitively.
+    """
+    starts, ends, scores = rake(_codepoints(text), STOP_TABLE, WORD_CHARS)
+    best = {}
+    for start, end, score in zip(starts, ends, scores):
+        phrase = " ".join(text[start:end].split())
+        key = phrase.lower()
+        if key not in best:
+            best[key] = (phrase, score)
+        elif score > best[key][1]:
+            best[key] = (best[key][0], score)
+    ranked = sorted(best.values(), key=lambda item: item[1], reverse=True)
+    return [phrase for phrase, _ in ranked[:top_k]]
@@ -0,0 +1,74 @@
+import threading
+
+import pytest
+
+from batcher import Batcher
+
+
+def submit_concurrently(batcher, texts):
+    results = {}
+    errors = {}
+    start = threading.Barrier(len(texts))
+
+    def call(text):
+        start.wait()
+        try:
+            results[text] = batcher.submit(text)
+        except BaseException as exc:
+            errors[text] = exc
+
+    threads = [threading.Thread(target=call, args=(text,)) for text in texts]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=5)
+        assert not thread.is_alive()
+    return results, errors
+
+
+def test_concurrent_submits_are_batched():
+    calls = []
+
+    def fn(texts):
+        calls.append(list(texts))
+        return [text.upper() for text in texts]
+
+    batcher = Batcher(fn, max_batch=4, max_wait_ms=200)
+    texts = [f"text {i}" for i in range(10)]
+    results, errors = submit_concurrently(batcher, texts)
+
+    assert not errors
+    assert results == {text: text.upper() for text in texts}
+    assert all(len(call) <= 4 for call in calls)
+    assert any(len(call) > 1 for call in calls)
+    assert sorted(text for call in calls for text in call) == sorted(texts)
+
+
+def test_error_is_raised_in_every_caller_of_the_batch():
+    def fn(texts):
+        raise ValueError("model failed")
+
+    batcher = Batcher(fn, max_batch=8, max_wait_ms=200)
+    results, errors = submit_concurrently(batcher, ["a", "b", "c"])
+
+    assert not results
+    assert set(errors) == {"a", "b", "c"}
+    assert all(isinstance(exc, ValueError) for exc in errors.values())
+
+
+def test_wrong_result_count_raises_instead_of_hanging():
+    batcher = Batcher(lambda texts: texts[:-1])
+    with pytest.raises(RuntimeError):
+        batcher.submit("a")
+
+
+def test_worker_keeps_serving_after_a_failed_batch():
+    def fn(texts):
+        if texts == ["bad"]:
+            raise SystemExit
+        return [text * 2 for text in texts]
+
+    batcher = Batcher(fn, max_wait_ms=1)
+    with pytest.raises(SystemExit):
+        batcher.submit("bad")
+    assert batcher.submit("ok") == "okok"
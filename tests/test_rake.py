@@ -0,0 +1,47 @@
+from rake import extract_keywords
+
+
+def test_keeps_original_casing():
+    keywords = extract_keywords("Microsoft Corporation announced earnings. Microsoft Corporation shares rose.")
+    assert "Microsoft Corporation announced earnings" in keywords
+    assert all(keyword == keyword.strip() for keyword in keywords)
+
+
+def test_dedupes_case_insensitively():
+    keywords = extract_keywords("Cloud computing grew. cloud computing grew.")
+    assert keywords == ["Cloud computing grew"]
+
+
+def test_lone_dashes_and_quotes_split_phrases():
+    keywords = extract_keywords("Results beat expectations - shares rose. The 'Apple' brand - famous worldwide -")
+    assert "beat expectations" not in keywords
+    assert "Results beat expectations" in keywords
+    assert "shares rose" in keywords
+    assert "Apple" in keywords
+    assert "brand" in keywords
+    assert "famous worldwide" in keywords
+    assert not any(keyword.startswith(("-", "'")) or keyword.endswith(("-", "'")) for keyword in keywords)
+
+
+def test_non_ascii_punctuation_and_symbols_split_phrases():
+    keywords = extract_keywords("Price rose 5€ today × analysts cheered ™ strong results")
+    assert "Price rose 5" in keywords
+    assert "today" in keywords
+    assert "analysts cheered" in keywords
+    assert "strong results" in keywords
+
+    keywords = extract_keywords("भारत सरकार। नई नीति！ quick launch 🚀 big success")
+    assert "भारत सरकार" in keywords
+    assert "नई नीति" in keywords
+    assert "quick launch" in keywords
+    assert "big success" in keywords
+
+
+def test_inner_hyphens_and_apostrophes_stay_in_words():
+    keywords = extract_keywords("After-hours trading of O'Reilly stock")
+    assert keywords == ["After-hours trading", "O'Reilly stock"]
+
+
+def test_stopwords_only():
+    assert extract_keywords("") == []
+    assert extract_keywords("The and OF") == []